@@ -5,17 +5,135 @@ This module handles authentication with Apple Music API and adding songs
 to the user's library.
 """
 
+import os
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
+import orjson
 import time
 import jwt
-from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Optional, Dict, List, Mapping
 from pathlib import Path
 
+from rate_limit import TokenBucket, retry_after_seconds
+from search_cache import SearchCache, match_from_cache
+
 logger = logging.getLogger(__name__)
 
 
+TOKEN_CACHE_PATH = Path.home() / '.cache' / 'apple_music' / 'dev_token.json'
+
+# Refresh the cached developer token once it is this close to expiring
+TOKEN_REFRESH_MARGIN = timedelta(days=7)
+
+# Private key contents keyed by path, so repeated clients skip the disk read
+_private_keys: Dict[str, str] = {}
+
+
+def _load_private_key(private_key_path: str) -> str:
+    """Read a .p8 private key, memoized per path for the life of the process."""
+    if private_key_path not in _private_keys:
+        with open(private_key_path, 'r') as f:
+            _private_keys[private_key_path] = f.read()
+    return _private_keys[private_key_path]
+
+
+def _read_cached_token(team_id: str, key_id: str) -> Optional[str]:
+    """Return the cached developer token if it matches and is not near expiry."""
+    try:
+        with open(TOKEN_CACHE_PATH, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # Anything unexpected (hand-edited or truncated file) just forces a new token
+    if not isinstance(cached, dict):
+        return None
+
+    token = cached.get('token')
+    exp = cached.get('exp')
+    if not isinstance(token, str) or not token:
+        return None
+    if isinstance(exp, bool) or not isinstance(exp, (int, float)):
+        return None
+
+    if cached.get('iss') != team_id or cached.get('kid') != key_id:
+        return None
+
+    now = datetime.now(timezone.utc)
+    if exp - now.timestamp() <= TOKEN_REFRESH_MARGIN.total_seconds():
+        return None
+
+    return token
+
+
+def _write_cached_token(token: str, team_id: str, key_id: str, exp: int):
+    """Atomically persist the developer token with owner-only permissions."""
+    try:
+        TOKEN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = TOKEN_CACHE_PATH.with_suffix('.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'token': token, 'iss': team_id, 'kid': key_id, 'exp': exp}, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, TOKEN_CACHE_PATH)
+    except OSError as e:
+        logger.warning(f"Could not cache developer token: {e}")
+
+
+def generate_developer_token(team_id: str, key_id: str, private_key_path: str) -> str:
+    """
+    Generate a developer token for Apple Music API.
+
+    A previously signed token cached under ~/.cache/apple_music is reused
+    until it is within a week of expiring.
+
+    Args:
+        team_id: Apple Developer Team ID
+        key_id: MusicKit Key ID
+        private_key_path: Path to the .p8 private key file
+
+    Returns:
+        JWT token string
+    """
+    cached_token = _read_cached_token(team_id, key_id)
+    if cached_token:
+        logger.info("Using cached developer token")
+        return cached_token
+
+    try:
+        private_key = _load_private_key(private_key_path)
+
+        # Token expires in 6 months (max allowed by Apple)
+        now = datetime.now(timezone.utc)
+        expiration = now + timedelta(days=180)
+
+        headers = {
+            'alg': 'ES256',
+            'kid': key_id
+        }
+
+        payload = {
+            'iss': team_id,
+            'iat': int(now.timestamp()),
+            'exp': int(expiration.timestamp())
+        }
+
+        token = jwt.encode(payload, private_key, algorithm='ES256', headers=headers)
+        logger.info("Successfully generated developer token")
+
+    except Exception as e:
+        logger.error(f"Failed to generate developer token: {e}")
+        raise
+
+    _write_cached_token(token, team_id, key_id, payload['exp'])
+    return token
+
+
 class AppleMusicClient:
     """
     Client for interacting with Apple Music API.
@@ -26,13 +144,18 @@ class AppleMusicClient:
 
     BASE_URL = "https://api.music.apple.com/v1"
 
+    # Maximum number of song IDs sent in one library request
+    LIBRARY_CHUNK_SIZE = 25
+
     def __init__(
         self,
         team_id: Optional[str] = None,
         key_id: Optional[str] = None,
         private_key_path: Optional[str] = None,
         developer_token: Optional[str] = None,
-        user_token: Optional[str] = None
+        user_token: Optional[str] = None,
+        rate: float = 10.0,
+        search_cache: Optional[SearchCache] = None
     ):
         """
         Initialize the Apple Music client.
@@ -43,8 +166,14 @@ class AppleMusicClient:
             private_key_path: Path to the .p8 private key file
             developer_token: Pre-generated developer token (alternative to generating)
             user_token: User-specific music token (required for library modifications)
+            rate: Maximum number of API requests per second
+            search_cache: Cache of resolved matches (default: persistent SearchCache)
         """
         self.user_token = user_token
+        # A cache created here is owned, and closed, by this client
+        self._owns_search_cache = search_cache is None
+        self._search_cache = search_cache if search_cache is not None else SearchCache()
+        self._bucket = TokenBucket(rate)
 
         # Generate or use provided developer token
         if developer_token:
@@ -63,8 +192,75 @@ class AppleMusicClient:
                 "No user token provided. Library modification features will not work."
             )
 
+        self._search_url = f"{self.BASE_URL}/catalog/us/search"
+        self._library_url = f"{self.BASE_URL}/me/library"
+        self._headers = self._build_headers()
+
+        # Reuse one pooled session so consecutive calls share a warm TLS connection
+        self._session = requests.Session()
+        # 429 is handled by _request so Retry-After is honored exactly once
+        retries = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET", "POST"]
+        )
+        self._session.mount(
+            'https://',
+            HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retries)
+        )
+        self._session.headers.update(self._get_headers())
+
         logger.info("Apple Music client initialized successfully")
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Release the pooled HTTP connections and the default search cache."""
+        self._session.close()
+        if self._owns_search_cache:
+            self._search_cache.close()
+
+    def set_user_token(self, user_token: Optional[str]):
+        """
+        Replace the user token and refresh the session headers.
+
+        Args:
+            user_token: New user-specific music token
+        """
+        self.user_token = user_token
+        self._headers = self._build_headers()
+        self._session.headers.pop('Music-User-Token', None)
+        self._session.headers.update(self._get_headers())
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a paced request, retrying once after a 429 response.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed through to requests.Session.request
+
+        Returns:
+            The final response
+        """
+        self._bucket.acquire()
+        response = self._session.request(method, url, **kwargs)
+
+        if response.status_code == 429:
+            delay = retry_after_seconds(response.headers.get('Retry-After'))
+            logger.warning(f"Rate limited by Apple Music, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            self._bucket.acquire()
+            response = self._session.request(method, url, **kwargs)
+
+        return response
+
     def _generate_developer_token(
         self, team_id: str, key_id: str, private_key_path: str
     ) -> str:
@@ -79,34 +275,14 @@ class AppleMusicClient:
         Returns:
             JWT token string
         """
-        try:
-            with open(private_key_path, 'r') as f:
-                private_key = f.read()
+        return generate_developer_token(team_id, key_id, private_key_path)
 
-            # Token expires in 6 months (max allowed by Apple)
-            expiration = datetime.utcnow() + timedelta(days=180)
-
-            headers = {
-                'alg': 'ES256',
-                'kid': key_id
-            }
-
-            payload = {
-                'iss': team_id,
-                'iat': int(datetime.utcnow().timestamp()),
-                'exp': int(expiration.timestamp())
-            }
-
-            token = jwt.encode(payload, private_key, algorithm='ES256', headers=headers)
-            logger.info("Successfully generated developer token")
-            return token
-
-        except Exception as e:
-            logger.error(f"Failed to generate developer token: {e}")
-            raise
-
-    def _get_headers(self) -> Dict[str, str]:
+    def _get_headers(self) -> Mapping[str, str]:
         """Get headers for API requests."""
+        return self._headers
+
+    def _build_headers(self) -> Mapping[str, str]:
+        """Build the (read-only) headers for API requests from the current tokens."""
         headers = {
             'Authorization': f'Bearer {self.developer_token}',
             'Content-Type': 'application/json'
@@ -115,7 +291,7 @@ class AppleMusicClient:
         if self.user_token:
             headers['Music-User-Token'] = self.user_token
 
-        return headers
+        return MappingProxyType(headers)
 
     def search_song(self, title: str, artist: str, limit: int = 5) -> Optional[Dict]:
         """
@@ -129,6 +305,12 @@ class AppleMusicClient:
         Returns:
             Dictionary containing the best match song data, or None if not found
         """
+        cache_key = SearchCache.key(title, artist)
+        cached = self._search_cache.get(cache_key)
+        if cached:
+            logger.info("Found song (cached): %s by %s", cached[1], cached[2])
+            return match_from_cache(cached)
+
         # Construct search query
         query = f"{title} {artist}".strip()
 
@@ -139,15 +321,15 @@ class AppleMusicClient:
         }
 
         try:
-            response = requests.get(
-                f"{self.BASE_URL}/catalog/us/search",
-                headers=self._get_headers(),
+            response = self._request(
+                'GET',
+                self._search_url,
                 params=params,
                 timeout=10
             )
 
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
 
             # Check if we got results
             if 'results' in data and 'songs' in data['results']:
@@ -156,16 +338,18 @@ class AppleMusicClient:
                 if songs:
                     # Return the best match (first result)
                     best_match = songs[0]
-                    logger.info(
-                        f"Found song: {best_match['attributes']['name']} by "
-                        f"{best_match['attributes']['artistName']}"
+                    song_name = best_match['attributes']['name']
+                    artist_name = best_match['attributes']['artistName']
+                    logger.info("Found song: %s by %s", song_name, artist_name)
+                    self._search_cache.put(
+                        cache_key, (best_match['id'], song_name, artist_name)
                     )
                     return best_match
 
-            logger.warning(f"No results found for: {title} by {artist}")
+            logger.warning("No results found for: %s by %s", title, artist)
             return None
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             logger.error(f"Error searching for song '{title}' by '{artist}': {e}")
             return None
 
@@ -179,45 +363,70 @@ class AppleMusicClient:
         Returns:
             True if successful, False otherwise
         """
+        return self.add_songs_to_library([song_id])['success'] == 1
+
+    def add_songs_to_library(self, song_ids: List[str], chunk: Optional[int] = None) -> Dict[str, int]:
+        """
+        Add songs to the user's Apple Music library, several IDs per request.
+
+        Args:
+            song_ids: List of Apple Music song IDs
+            chunk: Maximum number of IDs per request (default: LIBRARY_CHUNK_SIZE)
+
+        Returns:
+            Dictionary with counts: {'success': int, 'failed': int}
+        """
+        chunk = chunk or self.LIBRARY_CHUNK_SIZE
+        results = {'success': 0, 'failed': 0}
+
         if not self.user_token:
             logger.error("Cannot add to library: No user token provided")
-            return False
+            results['failed'] = len(song_ids)
+            return results
+
+        for start in range(0, len(song_ids), chunk):
+            chunk_ids = song_ids[start:start + chunk]
+            label = ', '.join(chunk_ids)
+
+            try:
+                payload = {
+                    'data': [
+                        {
+                            'id': song_id,
+                            'type': 'songs'
+                        }
+                        for song_id in chunk_ids
+                    ]
+                }
+
+                response = self._request(
+                    'POST',
+                    self._library_url,
+                    data=orjson.dumps(payload),
+                    params={'ids[songs]': ','.join(chunk_ids)},
+                    timeout=10
+                )
 
-        try:
-            payload = {
-                'data': [
-                    {
-                        'id': song_id,
-                        'type': 'songs'
-                    }
-                ]
-            }
-
-            response = requests.post(
-                f"{self.BASE_URL}/me/library",
-                headers=self._get_headers(),
-                json=payload,
-                params={'ids[songs]': song_id},
-                timeout=10
-            )
+                # 201 Created or 202 Accepted means success
+                if response.status_code in [201, 202]:
+                    logger.info("Successfully added song(s) %s to library", label)
+                    results['success'] += len(chunk_ids)
+                else:
+                    logger.warning(
+                        f"Unexpected response when adding song(s) {label}: "
+                        f"{response.status_code} - {response.text}"
+                    )
+                    results['failed'] += len(chunk_ids)
 
-            # 201 Created or 202 Accepted means success
-            if response.status_code in [201, 202]:
-                logger.info(f"Successfully added song {song_id} to library")
-                return True
-            else:
-                logger.warning(
-                    f"Unexpected response when adding song: {response.status_code} - {response.text}"
-                )
-                return False
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Error adding song(s) {label} to library: {e}")
+                results['failed'] += len(chunk_ids)
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error adding song {song_id} to library: {e}")
-            return False
+        return results
 
     def add_songs_batch(self, song_ids: List[str]) -> Dict[str, int]:
         """
-        Add multiple songs to the library with rate limiting.
+        Add multiple songs to the library in batched requests.
 
         Args:
             song_ids: List of Apple Music song IDs
@@ -225,18 +434,7 @@ class AppleMusicClient:
         Returns:
             Dictionary with counts: {'success': int, 'failed': int}
         """
-        results = {'success': 0, 'failed': 0}
-
-        for song_id in song_ids:
-            if self.add_song_to_library(song_id):
-                results['success'] += 1
-            else:
-                results['failed'] += 1
-
-            # Rate limiting: wait between requests
-            time.sleep(0.5)
-
-        return results
+        return self.add_songs_to_library(song_ids)
 
     def search_and_add_song(self, title: str, artist: str) -> tuple[bool, Optional[str]]:
         """
@@ -280,26 +478,25 @@ def test_client():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
-    # Initialize client
-    client = AppleMusicClient(
+    # Initialize client; closing it saves the search cache and frees the pool
+    with AppleMusicClient(
         team_id=os.getenv('APPLE_TEAM_ID'),
         key_id=os.getenv('APPLE_KEY_ID'),
         private_key_path=os.getenv('APPLE_PRIVATE_KEY_PATH'),
         user_token=os.getenv('APPLE_MUSIC_USER_TOKEN')
-    )
-
-    # Test search
-    print("\nTesting search functionality:")
-    result = client.search_song("Blinding Lights", "The Weeknd")
-    if result:
-        print(f"Found: {result['attributes']['name']} by {result['attributes']['artistName']}")
-        print(f"Song ID: {result['id']}")
-
-    # Test search and add (if user token is available)
-    if client.user_token:
-        print("\nTesting search and add functionality:")
-        success, message = client.search_and_add_song("Blinding Lights", "The Weeknd")
-        print(f"Result: {message}")
+    ) as client:
+        # Test search
+        print("\nTesting search functionality:")
+        result = client.search_song("Blinding Lights", "The Weeknd")
+        if result:
+            print(f"Found: {result['attributes']['name']} by {result['attributes']['artistName']}")
+            print(f"Song ID: {result['id']}")
+
+        # Test search and add (if user token is available)
+        if client.user_token:
+            print("\nTesting search and add functionality:")
+            success, message = client.search_and_add_song("Blinding Lights", "The Weeknd")
+            print(f"Result: {message}")
 
 
 if __name__ == '__main__':
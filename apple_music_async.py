@@ -0,0 +1,337 @@
+"""
+Async Apple Music Integration Module
+
+This module mirrors AppleMusicClient on top of httpx.AsyncClient so that
+searches and library additions for a batch of songs can overlap on a single
+multiplexed HTTP/2 connection instead of running one after another.
+"""
+
+import asyncio
+import httpx
+import logging
+import orjson
+from aiolimiter import AsyncLimiter
+from types import MappingProxyType
+from typing import Optional, Dict, List, Mapping
+
+from apple_music import generate_developer_token
+from rate_limit import retry_after_seconds
+from search_cache import SearchCache, match_from_cache
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAppleMusicClient:
+    """
+    Asynchronous client for interacting with Apple Music API.
+
+    Use it as an async context manager so the underlying connection pool is
+    opened and closed within the running event loop:
+
+        async with AsyncAppleMusicClient(developer_token=...) as client:
+            results = await client.add_songs_batch(song_ids)
+    """
+
+    BASE_URL = "https://api.music.apple.com/v1"
+
+    # Maximum number of song IDs sent in one library request
+    LIBRARY_CHUNK_SIZE = 25
+
+    def __init__(
+        self,
+        team_id: Optional[str] = None,
+        key_id: Optional[str] = None,
+        private_key_path: Optional[str] = None,
+        developer_token: Optional[str] = None,
+        user_token: Optional[str] = None,
+        max_concurrency: int = 8,
+        rate: float = 10.0,
+        search_cache: Optional[SearchCache] = None
+    ):
+        """
+        Initialize the async Apple Music client.
+
+        Args:
+            team_id: Apple Developer Team ID
+            key_id: MusicKit Key ID
+            private_key_path: Path to the .p8 private key file
+            developer_token: Pre-generated developer token (alternative to generating)
+            user_token: User-specific music token (required for library modifications)
+            max_concurrency: Maximum number of requests in flight at once
+            rate: Maximum number of API requests per second
+            search_cache: Cache of resolved matches (default: persistent SearchCache)
+        """
+        self.user_token = user_token
+        # A cache created here is owned, and closed, by this client
+        self._owns_search_cache = search_cache is None
+        self._search_cache = search_cache if search_cache is not None else SearchCache()
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limiter: Optional[AsyncLimiter] = None
+        # Bounds in-flight operations across all callers; created per event loop
+        self.semaphore: Optional[asyncio.Semaphore] = None
+
+        # Generate or use provided developer token
+        if developer_token:
+            self.developer_token = developer_token
+        elif team_id and key_id and private_key_path:
+            self.developer_token = generate_developer_token(
+                team_id, key_id, private_key_path
+            )
+        else:
+            raise ValueError(
+                "Must provide either developer_token or (team_id, key_id, private_key_path)"
+            )
+
+        if not self.user_token:
+            logger.warning(
+                "No user token provided. Library modification features will not work."
+            )
+
+        self._search_url = f"{self.BASE_URL}/catalog/us/search"
+        self._library_url = f"{self.BASE_URL}/me/library"
+        self._headers = self._build_headers()
+
+        logger.info("Async Apple Music client initialized successfully")
+
+    async def __aenter__(self):
+        self._limiter = AsyncLimiter(self.rate, 1)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._client = httpx.AsyncClient(
+            http2=True,
+            headers=self._get_headers(),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            timeout=10
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Release the pooled HTTP connections and the default search cache."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._owns_search_cache:
+            await asyncio.to_thread(self._search_cache.close)
+
+    def _get_headers(self) -> Mapping[str, str]:
+        """Get headers for API requests."""
+        return self._headers
+
+    def _build_headers(self) -> Mapping[str, str]:
+        """Build the (read-only) headers for API requests from the current tokens."""
+        headers = {
+            'Authorization': f'Bearer {self.developer_token}',
+            'Content-Type': 'application/json'
+        }
+
+        if self.user_token:
+            headers['Music-User-Token'] = self.user_token
+
+        return MappingProxyType(headers)
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a paced request, retrying once after a 429 response.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed through to httpx.AsyncClient.request
+
+        Returns:
+            The final response
+        """
+        async with self._limiter:
+            response = await self._client.request(method, url, **kwargs)
+
+        if response.status_code == 429:
+            delay = retry_after_seconds(response.headers.get('Retry-After'))
+            logger.warning(f"Rate limited by Apple Music, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            async with self._limiter:
+                response = await self._client.request(method, url, **kwargs)
+
+        return response
+
+    async def search_song(self, title: str, artist: str, limit: int = 5) -> Optional[Dict]:
+        """
+        Search for a song on Apple Music.
+
+        Args:
+            title: Song title
+            artist: Artist name
+            limit: Maximum number of results to return
+
+        Returns:
+            Dictionary containing the best match song data, or None if not found
+        """
+        cache_key = SearchCache.key(title, artist)
+        # Cache lookups may hit SQLite, so keep them off the event loop
+        cached = await asyncio.to_thread(self._search_cache.get, cache_key)
+        if cached:
+            logger.info("Found song (cached): %s by %s", cached[1], cached[2])
+            return match_from_cache(cached)
+
+        # Construct search query
+        query = f"{title} {artist}".strip()
+
+        params = {
+            'term': query,
+            'types': 'songs',
+            'limit': limit
+        }
+
+        try:
+            response = await self._request(
+                'GET',
+                self._search_url,
+                params=params
+            )
+
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+
+            # Check if we got results
+            if 'results' in data and 'songs' in data['results']:
+                songs = data['results']['songs']['data']
+
+                if songs:
+                    # Return the best match (first result)
+                    best_match = songs[0]
+                    song_name = best_match['attributes']['name']
+                    artist_name = best_match['attributes']['artistName']
+                    logger.info("Found song: %s by %s", song_name, artist_name)
+                    await asyncio.to_thread(
+                        self._search_cache.put,
+                        cache_key, (best_match['id'], song_name, artist_name)
+                    )
+                    return best_match
+
+            logger.warning("No results found for: %s by %s", title, artist)
+            return None
+
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            logger.error(f"Error searching for song '{title}' by '{artist}': {e}")
+            return None
+
+    async def add_song_to_library(self, song_id: str) -> bool:
+        """
+        Add a song to the user's Apple Music library.
+
+        Args:
+            song_id: Apple Music song ID
+
+        Returns:
+            True if successful, False otherwise
+        """
+        results = await self.add_songs_to_library([song_id])
+        return results['success'] == 1
+
+    async def add_songs_to_library(self, song_ids: List[str], chunk: Optional[int] = None) -> Dict[str, int]:
+        """
+        Add songs to the user's Apple Music library, several IDs per request.
+
+        Chunks are sent concurrently, bounded by the client-wide semaphore.
+
+        Args:
+            song_ids: List of Apple Music song IDs
+            chunk: Maximum number of IDs per request (default: LIBRARY_CHUNK_SIZE)
+
+        Returns:
+            Dictionary with counts: {'success': int, 'failed': int}
+        """
+        chunk = chunk or self.LIBRARY_CHUNK_SIZE
+        if not self.user_token:
+            logger.error("Cannot add to library: No user token provided")
+            return {'success': 0, 'failed': len(song_ids)}
+
+        async def bounded(chunk_ids: List[str]) -> bool:
+            async with self.semaphore:
+                return await self._add_chunk(chunk_ids)
+
+        chunks = [song_ids[start:start + chunk] for start in range(0, len(song_ids), chunk)]
+        outcomes = await asyncio.gather(*[bounded(chunk_ids) for chunk_ids in chunks])
+
+        success = sum(len(chunk_ids) for chunk_ids, added in zip(chunks, outcomes) if added)
+        return {'success': success, 'failed': len(song_ids) - success}
+
+    async def _add_chunk(self, chunk_ids: List[str]) -> bool:
+        """Add one chunk of song IDs in a single library request."""
+        label = ', '.join(chunk_ids)
+
+        try:
+            payload = {
+                'data': [
+                    {
+                        'id': song_id,
+                        'type': 'songs'
+                    }
+                    for song_id in chunk_ids
+                ]
+            }
+
+            response = await self._request(
+                'POST',
+                self._library_url,
+                content=orjson.dumps(payload),
+                params={'ids[songs]': ','.join(chunk_ids)}
+            )
+
+            # 201 Created or 202 Accepted means success
+            if response.status_code in [201, 202]:
+                logger.info("Successfully added song(s) %s to library", label)
+                return True
+            else:
+                logger.warning(
+                    f"Unexpected response when adding song(s) {label}: "
+                    f"{response.status_code} - {response.text}"
+                )
+                return False
+
+        except httpx.HTTPError as e:
+            logger.error(f"Error adding song(s) {label} to library: {e}")
+            return False
+
+    async def add_songs_batch(self, song_ids: List[str]) -> Dict[str, int]:
+        """
+        Add multiple songs to the library in batched, concurrent requests.
+
+        Args:
+            song_ids: List of Apple Music song IDs
+
+        Returns:
+            Dictionary with counts: {'success': int, 'failed': int}
+        """
+        return await self.add_songs_to_library(song_ids)
+
+    async def search_and_add_song(self, title: str, artist: str) -> tuple[bool, Optional[str]]:
+        """
+        Search for a song and add it to the library in one operation.
+
+        Args:
+            title: Song title
+            artist: Artist name
+
+        Returns:
+            Tuple of (success: bool, message: str)
+        """
+        # Search for the song
+        song = await self.search_song(title, artist)
+
+        if not song:
+            return False, "Song not found in Apple Music catalog"
+
+        # Extract song info
+        song_id = song['id']
+        song_name = song['attributes']['name']
+        artist_name = song['attributes']['artistName']
+
+        # Add to library
+        if await self.add_song_to_library(song_id):
+            return True, f"Added '{song_name}' by {artist_name}"
+        else:
+            return False, f"Found '{song_name}' but failed to add to library"
@@ -7,33 +7,65 @@ from posts (especially Reels) that contain music.
 
 import instaloader
 import logging
-import time
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+import re
+from itertools import islice
+from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass, field
+
+from rate_limit import TokenBucket
+from search_cache import song_key
 
 logger = logging.getLogger(__name__)
 
+# Music note emoji Instagram users put next to song credits: ♪ ♫ 🎵 🎶
+_MUSIC_EMOJI_RE = re.compile('[\u266a\u266b\U0001f3b5\U0001f3b6]')
+
+# "Song Title · Artist Name" in Reel titles
+_TITLE_SPLIT_RE = re.compile(r'\s*\u00b7\s*')
+
+# "Song Name - Artist Name" in captions
+_CAPTION_SPLIT_RE = re.compile(r'\s*-\s*')
+
 
-@dataclass
+@dataclass(frozen=True)
 class Song:
     """Data class to represent a song extracted from Instagram"""
     title: str
     artist: str
     post_url: Optional[str] = None
+    # Normalized (title, artist) used for hashing and equality
+    _key: Tuple[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, '_key', song_key(self.title, self.artist))
 
     def __hash__(self):
-        return hash((self.title.lower(), self.artist.lower()))
+        return hash(self._key)
 
     def __eq__(self, other):
         if not isinstance(other, Song):
             return False
-        return (self.title.lower() == other.title.lower() and
-                self.artist.lower() == other.artist.lower())
+        return self._key == other._key
 
     def __str__(self):
         return f"{self.title} by {self.artist}"
 
 
+class PacedRateController(instaloader.RateController):
+    """
+    Instaloader rate controller that also paces every query through a token
+    bucket, so throttling applies to actual HTTP requests rather than posts.
+    """
+
+    def __init__(self, context, bucket: TokenBucket):
+        super().__init__(context)
+        self._bucket = bucket
+
+    def wait_before_query(self, query_type: str):
+        super().wait_before_query(query_type)
+        self._bucket.acquire()
+
+
 class InstagramScraper:
     """
     Scraper for extracting song information from Instagram posts.
@@ -42,14 +74,21 @@ class InstagramScraper:
     and extracts music information from those posts.
     """
 
-    def __init__(self, username: Optional[str] = None, password: Optional[str] = None):
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        requests_per_second: float = 1.0
+    ):
         """
         Initialize the Instagram scraper.
 
         Args:
             username: Instagram username for authentication (optional)
             password: Instagram password for authentication (optional)
+            requests_per_second: Maximum rate of requests sent to Instagram
         """
+        self.bucket = TokenBucket(requests_per_second)
         self.loader = instaloader.Instaloader(
             download_pictures=False,
             download_videos=False,
@@ -59,6 +98,9 @@ class InstagramScraper:
             save_metadata=False,
             compress_json=False,
             post_metadata_txt_pattern='',
+            max_connection_attempts=3,
+            request_timeout=30.0,
+            rate_controller=lambda context: PacedRateController(context, self.bucket),
         )
 
         self.authenticated = False
@@ -80,7 +122,7 @@ class InstagramScraper:
             max_posts: Maximum number of posts to scrape (default 100)
 
         Returns:
-            List of unique Song objects found in the posts
+            List of unique Song objects found in the posts, in the order first seen
         """
         logger.info(f"Starting to scrape songs from @{target_username}")
 
@@ -93,27 +135,23 @@ class InstagramScraper:
             logger.error(f"Failed to fetch profile for @{target_username}: {e}")
             return []
 
-        songs = set()
+        # Keyed on the normalized (title, artist); keeps first-seen order
+        songs: Dict[Tuple[str, str], Song] = {}
         posts_checked = 0
 
         try:
-            for post in profile.get_posts():
-                if posts_checked >= max_posts:
-                    break
-
+            for post in islice(profile.get_posts(), max_posts):
                 posts_checked += 1
 
-                # Extract song information from post
+                # Extract song information from post; lazy Post properties
+                # (e.g. title) may fetch full metadata, paced by PacedRateController
                 song = self._extract_song_from_post(post)
                 if song:
-                    songs.add(song)
-                    logger.info(f"Found song: {song}")
-
-                # Be polite with rate limiting
-                time.sleep(1)
+                    songs.setdefault(song._key, song)
+                    logger.info("Found song: %s", song)
 
                 if posts_checked % 10 == 0:
-                    logger.info(f"Processed {posts_checked} posts, found {len(songs)} unique songs so far")
+                    logger.info("Processed %d posts, found %d unique songs so far", posts_checked, len(songs))
 
         except instaloader.exceptions.ConnectionException as e:
             logger.error(f"Connection error while scraping: {e}")
@@ -121,7 +159,7 @@ class InstagramScraper:
             logger.error(f"Unexpected error while scraping: {e}")
 
         logger.info(f"Scraping complete: Checked {posts_checked} posts, found {len(songs)} unique songs")
-        return list(songs)
+        return list(songs.values())
 
     def _extract_song_from_post(self, post) -> Optional[Song]:
         """
@@ -134,60 +172,47 @@ class InstagramScraper:
             Song object if music found, None otherwise
         """
         try:
+            # Read each (possibly lazy) attribute once
+            post_title = getattr(post, 'title', None)
+            is_video = getattr(post, 'is_video', False)
+
             # Check if post has title (common for Reels with music)
-            if hasattr(post, 'title') and post.title:
+            if post_title:
                 # Try to parse title for song information
                 # Instagram often formats as "Song Title · Artist Name"
-                if '·' in post.title:
-                    parts = post.title.split('·')
-                    if len(parts) >= 2:
-                        title = parts[0].strip()
-                        artist = parts[1].strip()
-                        return Song(
-                            title=title,
-                            artist=artist,
-                            post_url=f"https://www.instagram.com/p/{post.shortcode}/"
-                        )
-
-            # Check for accessibility caption which sometimes contains music info
-            if hasattr(post, 'accessibility_caption') and post.accessibility_caption:
-                caption = post.accessibility_caption.lower()
-                if 'music' in caption or 'audio' in caption:
-                    # Extract from caption if possible
-                    # This is less reliable but can work
-                    pass
-
-            # Check if post is a video (Reels) which are more likely to have music
-            if hasattr(post, 'is_video') and post.is_video:
-                # Try to get media product type
-                if hasattr(post, 'media_product_type'):
-                    if post.media_product_type == 'clips':  # This is a Reel
-                        # Instaloader doesn't directly expose music metadata
-                        # but we can try to get it from the caption or comments
-                        caption = post.caption if post.caption else ""
-
-                        # Look for common music-related hashtags or mentions
-                        # Format: Song Name - Artist Name
-                        if '-' in caption and ('♫' in caption or '🎵' in caption or '🎶' in caption):
-                            # Try to extract song info from caption
-                            lines = caption.split('\n')
-                            for line in lines:
-                                if '♫' in line or '🎵' in line or '🎶' in line:
-                                    # Remove emoji and try to parse
-                                    line = line.replace('♫', '').replace('🎵', '').replace('🎶', '').strip()
-                                    if '-' in line:
-                                        parts = line.split('-')
-                                        if len(parts) >= 2:
-                                            title = parts[0].strip()
-                                            artist = parts[1].strip()
-                                            return Song(
-                                                title=title,
-                                                artist=artist,
-                                                post_url=f"https://www.instagram.com/p/{post.shortcode}/"
-                                            )
+                parts = _TITLE_SPLIT_RE.split(post_title.strip(), maxsplit=2)
+                if len(parts) >= 2:
+                    return Song(
+                        title=parts[0],
+                        artist=parts[1],
+                        post_url=f"https://www.instagram.com/p/{post.shortcode}/"
+                    )
+
+            # Check if post is a Reel (video clip), which is more likely to have music
+            if is_video and getattr(post, 'media_product_type', None) == 'clips':
+                # Instaloader doesn't directly expose music metadata
+                # but we can try to get it from the caption
+                caption = getattr(post, 'caption', None) or ""
+
+                # Look for common music-related hashtags or mentions
+                # Format: Song Name - Artist Name
+                if '-' in caption and _MUSIC_EMOJI_RE.search(caption):
+                    # Try to extract song info from caption
+                    for line in caption.split('\n'):
+                        # Remove emoji and try to parse
+                        line, found = _MUSIC_EMOJI_RE.subn('', line)
+                        if not found:
+                            continue
+                        parts = _CAPTION_SPLIT_RE.split(line.strip(), maxsplit=2)
+                        if len(parts) >= 2:
+                            return Song(
+                                title=parts[0],
+                                artist=parts[1],
+                                post_url=f"https://www.instagram.com/p/{post.shortcode}/"
+                            )
 
         except Exception as e:
-            logger.debug(f"Error extracting song from post: {e}")
+            logger.debug("Error extracting song from post: %s", e)
 
         return None
 
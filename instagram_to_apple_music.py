@@ -19,7 +19,9 @@ Options:
 
 import os
 import sys
+import asyncio
 import logging
+import logging.handlers
 import argparse
 import csv
 from datetime import datetime
@@ -28,12 +30,17 @@ from typing import List, Dict
 from dotenv import load_dotenv
 
 from instagram_scraper import InstagramScraper, Song
-from apple_music import AppleMusicClient
+from apple_music_async import AsyncAppleMusicClient
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
 
 class InstagramToAppleMusic:
     """Main orchestrator class for the Instagram to Apple Music pipeline."""
 
+    # Set once _setup_logging has installed handlers for this process
+    _logging_configured = False
+
     def __init__(self, config: Dict):
         """
         Initialize the orchestrator.
@@ -55,7 +62,7 @@ class InstagramToAppleMusic:
         # Initialize Apple Music client (if not in dry run or output-only mode)
         if not self.dry_run and not self.output_only:
             try:
-                self.apple_music_client = AppleMusicClient(
+                self.apple_music_client = AsyncAppleMusicClient(
                     team_id=config.get('apple_team_id'),
                     key_id=config.get('apple_key_id'),
                     private_key_path=config.get('apple_private_key_path'),
@@ -73,25 +80,42 @@ class InstagramToAppleMusic:
                 self.logger.info("Running in OUTPUT ONLY mode - songs will be saved to file only")
 
     def _setup_logging(self, level: str) -> logging.Logger:
-        """Setup logging configuration."""
+        """
+        Setup logging configuration.
+
+        Handlers are only created once per process; later orchestrators just
+        adjust the level. If the root logger was already configured by the
+        caller, its handlers are kept and only the level is applied.
+        """
         log_level = getattr(logging, level.upper(), logging.INFO)
+        root = logging.getLogger()
+
+        # Already configured, by us or by the caller: only apply the level
+        if InstagramToAppleMusic._logging_configured or root.handlers:
+            root.setLevel(log_level)
+            return logging.getLogger(__name__)
 
         # Create logs directory if it doesn't exist
         log_dir = Path('logs')
         log_dir.mkdir(exist_ok=True)
 
-        # Configure logging
+        file_handler = logging.FileHandler(
+            log_dir / f"instagram_to_apple_music_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+        )
+        # The formatter is set on the buffered target, which does the writing
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        # Configure logging; file writes are buffered and flushed on ERROR or exit
         logging.basicConfig(
             level=log_level,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            format=LOG_FORMAT,
             handlers=[
-                logging.FileHandler(
-                    log_dir / f"instagram_to_apple_music_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-                ),
+                logging.handlers.MemoryHandler(capacity=1024, target=file_handler),
                 logging.StreamHandler()
             ]
         )
 
+        InstagramToAppleMusic._logging_configured = True
         return logging.getLogger(__name__)
 
     def run(self) -> Dict:
@@ -170,8 +194,17 @@ class InstagramToAppleMusic:
             }
         }
 
+        if not self.output_only and not self.dry_run:
+            outcomes = asyncio.run(self._process_songs_async(songs))
+            for i, (song, (success, message)) in enumerate(zip(songs, outcomes), 1):
+                self.logger.debug("Processing: %s", song)
+                self._record_result(results, song, success, message)
+                self._log_progress(i, len(songs))
+            return results
+
         for i, song in enumerate(songs, 1):
-            self.logger.info(f"\n[{i}/{len(songs)}] Processing: {song}")
+            self.logger.debug("Processing: %s", song)
+            self._log_progress(i, len(songs))
 
             if self.output_only:
                 self.logger.info("  [OUTPUT ONLY] Song will be saved to file")
@@ -182,53 +215,106 @@ class InstagramToAppleMusic:
                 results['stats']['songs_added'] += 1
                 continue
 
-            if self.dry_run:
-                self.logger.info("  [DRY RUN] Would search and add to Apple Music")
-                results['added'].append({
-                    'song': song,
-                    'message': 'DRY RUN - not actually added'
-                })
-                results['stats']['songs_added'] += 1
-                continue
+            self.logger.info("  [DRY RUN] Would search and add to Apple Music")
+            results['added'].append({
+                'song': song,
+                'message': 'DRY RUN - not actually added'
+            })
+            results['stats']['songs_added'] += 1
 
-            try:
-                success, message = self.apple_music_client.search_and_add_song(
-                    song.title,
-                    song.artist
-                )
+        return results
 
-                if success:
-                    self.logger.info(f"  ✓ {message}")
-                    results['added'].append({
-                        'song': song,
-                        'message': message
-                    })
-                    results['stats']['songs_added'] += 1
-                elif 'not found' in message.lower():
-                    self.logger.warning(f"  ✗ {message}")
-                    results['not_found'].append({
-                        'song': song,
-                        'message': message
-                    })
-                    results['stats']['songs_not_found'] += 1
-                else:
-                    self.logger.error(f"  ✗ {message}")
-                    results['failed'].append({
-                        'song': song,
-                        'message': message
-                    })
-                    results['stats']['songs_failed'] += 1
+    async def _process_songs_async(self, songs: List[Song]) -> List[tuple]:
+        """
+        Search for and add songs to Apple Music.
+
+        All searches run concurrently first; the matches are then added to the
+        library in batched requests.
+
+        Args:
+            songs: List of Song objects
 
+        Returns:
+            List of (success, message) tuples in the same order as songs
+        """
+        client = self.apple_music_client
+
+        async def search(song: Song):
+            async with client.semaphore:
+                try:
+                    return await client.search_song(song.title, song.artist)
+                except Exception as e:
+                    return e
+
+        async def add(chunk: List[tuple]):
+            # Bounded inside add_songs_to_library by the same client semaphore
+            song_ids = [match['id'] for _, match in chunk]
+            try:
+                added = await client.add_songs_to_library(song_ids, chunk=len(song_ids))
             except Exception as e:
-                error_msg = f"Unexpected error: {str(e)}"
-                self.logger.error(f"  ✗ {error_msg}")
-                results['failed'].append({
-                    'song': song,
-                    'message': error_msg
-                })
-                results['stats']['songs_failed'] += 1
+                return e
+            return added['success'] == len(song_ids)
 
-        return results
+        outcomes = [None] * len(songs)
+
+        async with client:
+            matches = await asyncio.gather(*[search(song) for song in songs])
+
+            found = []
+            for i, match in enumerate(matches):
+                if isinstance(match, Exception):
+                    # None marks an exception so it is never filed as "not found"
+                    outcomes[i] = (None, f"Unexpected error: {str(match)}")
+                elif match is None:
+                    outcomes[i] = (False, "Song not found in Apple Music catalog")
+                else:
+                    found.append((i, match))
+
+            size = client.LIBRARY_CHUNK_SIZE
+            chunks = [found[start:start + size] for start in range(0, len(found), size)]
+            added = await asyncio.gather(*[add(chunk) for chunk in chunks])
+
+        for chunk, success in zip(chunks, added):
+            for i, match in chunk:
+                song_name = match['attributes']['name']
+                artist_name = match['attributes']['artistName']
+                if isinstance(success, Exception):
+                    outcomes[i] = (None, f"Unexpected error: {str(success)}")
+                elif success:
+                    outcomes[i] = (True, f"Added '{song_name}' by {artist_name}")
+                else:
+                    outcomes[i] = (False, f"Found '{song_name}' but failed to add to library")
+
+        return outcomes
+
+    def _log_progress(self, i: int, total: int):
+        """Log a progress line every 10 songs and after the last one."""
+        if i % 10 == 0 or i == total:
+            self.logger.info("[%d/%d] songs processed", i, total)
+
+    def _record_result(self, results: Dict, song: Song, success: bool, message: str):
+        """Log the outcome for a song and file it under the matching bucket."""
+        if success:
+            self.logger.info("  ✓ %s", message)
+            results['added'].append({
+                'song': song,
+                'message': message
+            })
+            results['stats']['songs_added'] += 1
+        elif success is False and 'not found' in message.lower():
+            self.logger.warning("  ✗ %s: %s", song, message)
+            results['not_found'].append({
+                'song': song,
+                'message': message
+            })
+            results['stats']['songs_not_found'] += 1
+        else:
+            self.logger.error("  ✗ %s: %s", song, message)
+            results['failed'].append({
+                'song': song,
+                'message': message
+            })
+            results['stats']['songs_failed'] += 1
 
     def _print_summary(self, results: Dict):
         """Print execution summary."""
@@ -262,43 +348,21 @@ class InstagramToAppleMusic:
         """Save results to CSV file."""
         output_file = self.config['output_file']
 
+        rows = (
+            (item['song'].title, item['song'].artist, status, item['message'], item['song'].post_url or '')
+            for status, bucket in (
+                ('ADDED', results['added']),
+                ('NOT_FOUND', results['not_found']),
+                ('FAILED', results['failed'])
+            )
+            for item in bucket
+        )
+
         try:
-            with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 16) as f:
                 writer = csv.writer(f)
                 writer.writerow(['Song Title', 'Artist', 'Status', 'Message', 'Instagram Post URL'])
-
-                # Write added songs
-                for item in results['added']:
-                    song = item['song']
-                    writer.writerow([
-                        song.title,
-                        song.artist,
-                        'ADDED',
-                        item['message'],
-                        song.post_url or ''
-                    ])
-
-                # Write not found songs
-                for item in results['not_found']:
-                    song = item['song']
-                    writer.writerow([
-                        song.title,
-                        song.artist,
-                        'NOT_FOUND',
-                        item['message'],
-                        song.post_url or ''
-                    ])
-
-                # Write failed songs
-                for item in results['failed']:
-                    song = item['song']
-                    writer.writerow([
-                        song.title,
-                        song.artist,
-                        'FAILED',
-                        item['message'],
-                        song.post_url or ''
-                    ])
+                writer.writerows(rows)
 
             self.logger.info(f"\nResults saved to: {output_file}")
 
@@ -0,0 +1,84 @@
+"""
+Rate Limiting Module
+
+This module provides a small token-bucket limiter used to pace requests to
+external APIs, plus a helper for interpreting Retry-After headers.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at `rate_per_sec` up to `burst`. Each call to
+    acquire() consumes one token, sleeping only as long as needed for one to
+    become available.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: Optional[int] = None):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate_per_sec: Sustained number of acquisitions allowed per second
+            burst: Maximum tokens that can accumulate (default: one second's worth)
+        """
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be positive")
+
+        self.rate = rate_per_sec
+        self.burst = burst if burst is not None else max(1, int(rate_per_sec))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        # Sleeping outside the lock lets other threads queue up behind the debt
+        if wait > 0:
+            time.sleep(wait)
+
+
+def retry_after_seconds(value: Optional[str], default: float = 1.0) -> float:
+    """
+    Convert a Retry-After header value into a number of seconds.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+        default: Delay to use when the header is missing or malformed
+
+    Returns:
+        Number of seconds to wait (never negative)
+    """
+    if not value:
+        return default
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
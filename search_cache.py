@@ -0,0 +1,191 @@
+"""
+Search Cache Module
+
+This module memoizes Apple Music catalog matches keyed on normalized
+(title, artist) text, in memory and optionally on disk, so repeated searches
+for the same song skip the network round-trip.
+"""
+
+import logging
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_PATH = Path.home() / '.cache' / 'apple_music' / 'search.sqlite'
+
+# (song_id, song_name, artist_name) for a resolved catalog match
+CachedMatch = Tuple[str, str, str]
+
+
+def _commit_and_close(db: sqlite3.Connection):
+    """Commit pending writes and close a cache connection (finalizer target)."""
+    try:
+        db.commit()
+        db.close()
+    except sqlite3.Error as e:
+        logger.debug(f"Search cache commit failed: {e}")
+
+
+def song_key(title: str, artist: str) -> Tuple[str, str]:
+    """Normalize a (title, artist) pair for matching the same song."""
+    return title.casefold().strip(), artist.casefold().strip()
+
+
+class SearchCache:
+    """
+    LRU cache of resolved catalog matches with optional SQLite persistence.
+
+    Only successful matches are cached, so songs that were not found (or
+    failed to search) are retried on the next lookup. Writes are committed
+    to disk in batches, and on flush(), close(), garbage collection or
+    interpreter exit, so callers that never call close() keep their matches.
+    """
+
+    # Number of puts between SQLite commits
+    COMMIT_EVERY = 50
+
+    def __init__(self, path: Optional[Path] = SEARCH_CACHE_PATH, maxsize: int = 4096):
+        """
+        Initialize the search cache.
+
+        Args:
+            path: SQLite file to persist matches in, or None for memory only
+            maxsize: Maximum number of matches kept in memory
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._uncommitted = 0
+        self._finalizer: Optional[weakref.finalize] = None
+
+        if path is not None:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(path), check_same_thread=False)
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS matches ('
+                    'title TEXT, artist TEXT, song_id TEXT, song_name TEXT, artist_name TEXT, '
+                    'PRIMARY KEY (title, artist))'
+                )
+                self._db.commit()
+                # Runs on garbage collection or at interpreter exit
+                self._finalizer = weakref.finalize(self, _commit_and_close, self._db)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Search cache persistence disabled: {e}")
+                self._db = None
+
+    @staticmethod
+    def key(title: str, artist: str) -> Tuple[str, str]:
+        """Normalize a (title, artist) pair into a cache key."""
+        return song_key(title, artist)
+
+    def get(self, key: Tuple[str, str]) -> Optional[CachedMatch]:
+        """
+        Look up a cached match.
+
+        Args:
+            key: Normalized key from SearchCache.key()
+
+        Returns:
+            (song_id, song_name, artist_name) tuple, or None on a miss
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            if self._db is None:
+                return None
+
+            try:
+                row = self._db.execute(
+                    'SELECT song_id, song_name, artist_name FROM matches '
+                    'WHERE title = ? AND artist = ?',
+                    key
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.debug(f"Search cache lookup failed: {e}")
+                return None
+
+            if row is None:
+                return None
+
+            self._remember(key, tuple(row))
+            return self._entries[key]
+
+    def put(self, key: Tuple[str, str], match: CachedMatch):
+        """
+        Store a resolved match.
+
+        Args:
+            key: Normalized key from SearchCache.key()
+            match: (song_id, song_name, artist_name) tuple
+        """
+        with self._lock:
+            self._remember(key, match)
+
+            if self._db is None:
+                return
+
+            try:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?)',
+                    key + tuple(match)
+                )
+                self._uncommitted += 1
+                if self._uncommitted >= self.COMMIT_EVERY:
+                    self._commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Search cache write failed: {e}")
+
+    def _remember(self, key: Tuple[str, str], match: CachedMatch):
+        self._entries[key] = match
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _commit(self):
+        self._db.commit()
+        self._uncommitted = 0
+
+    def flush(self):
+        """Commit any pending writes to disk."""
+        with self._lock:
+            if self._db is None or not self._uncommitted:
+                return
+            try:
+                self._commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Search cache commit failed: {e}")
+
+    def close(self):
+        """
+        Commit pending writes and close the SQLite connection, if any.
+
+        The cache keeps working in memory only afterwards.
+        """
+        with self._lock:
+            if self._db is not None:
+                # Calling the finalizer runs it now and disarms it
+                self._finalizer()
+                self._db = None
+                self._uncommitted = 0
+
+
+def match_from_cache(match: CachedMatch) -> Dict:
+    """Rebuild the subset of a catalog song dict that callers rely on."""
+    song_id, song_name, artist_name = match
+    return {
+        'id': song_id,
+        'type': 'songs',
+        'attributes': {
+            'name': song_name,
+            'artistName': artist_name
+        }
+    }